@@ -6,9 +6,17 @@ Parse PlantUML and generate CSVs with semantic fake data, FK consistency, M:N jo
 association entities preserved, and many dataset-specific rules.
 Python 3.
 Usage:
-    python3 puml2csv_semantic_final.py model.puml out_dir [rows]
+    python3 puml2csv_semantic_final.py model.puml out_dir [rows] [seed] [workers]
+    (pass '' or - as seed for an unseeded run, e.g. with workers)
 """
-import re, os, sys, csv, random
+import re, os, sys, csv, io, gzip, random
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain, islice
+from operator import itemgetter
 
 # ---------------- Semantic pools and helpers ----------------
 DOC_TITLES = [
@@ -32,19 +40,31 @@ POSITION_TITLES = ["full professor","librarian","developer"]
 ORG_TYPES = ["Faculty","Research Center","Research Institute","College","NGO"]
 ORG_NAMES = ["University of Belgrade", "Faculty of Science", "Institute of AI", "Research Center VINCA", "Open Data Lab"]
 
+# compiled once; only used when the plain-string fast path can't decide
+_ENTITY_RE = re.compile(r'^entity\s+([A-Za-z0-9_]+)')
 
-def make_orcid():
+# output: file buffer size and how many rows are generated/written per batch
+WRITE_BUFFER = 1 << 16
+BATCH_SIZE = 4096
+
+
+def make_orcid(rng=random):
     # generate pseudo-ORCID like 0000-0002-1825-0097
     def block():
-        return "%04d" % random.randint(0,9999)
+        return "%04d" % rng.randint(0,9999)
     return "-".join(block() for _ in range(4))
 
-def make_issn():
-    return "%04d-%04d" % (random.randint(1000,9999), random.randint(1000,9999))
+def make_orcids(n, rng=random):
+    # n pseudo-ORCIDs from a single batch of 4*n draws
+    it = iter(rng.choices(range(10000), k=4 * n))
+    return ["%04d-%04d-%04d-%04d" % blocks for blocks in zip(it, it, it, it)]
+
+def make_issn(rng=random):
+    return "%04d-%04d" % (rng.randint(1000,9999), rng.randint(1000,9999))
 
-def make_ror():
+def make_ror(rng=random):
     # pseudo ROR id: ror.org/xxxxx - realistic RORs have 9-char id starting with 0..9/letters, but we fake plausible
-    suffix = "".join(random.choice("0123456789abcdefghijklmnopqrstuvwxyz") for _ in range(9))
+    suffix = "".join(rng.choice("0123456789abcdefghijklmnopqrstuvwxyz") for _ in range(9))
     return "https://ror.org/" + suffix
 
 def make_abbrev(name):
@@ -55,10 +75,27 @@ def make_abbrev(name):
     abb = "".join(p[0].upper() for p in parts if p)
     return abb[:6]
 
+# abbreviations only depend on the (small) pools, so derive them once
+_JOURNAL_ABBREVS = tuple(make_abbrev(t) for t in JOURNAL_TITLES)
+_ORG_ABBREVS = tuple(make_abbrev(n) for n in ORG_NAMES)
+_FULLNAMES = tuple(f"{a} {b}" for a in FIRSTNAMES for b in LASTNAMES)
+
 # ---------------- PUML parsing ----------------
+def entity_name(line):
+    # name declared on an "entity Name {" line, or None
+    if not line.startswith('entity'):
+        return None
+    if line.startswith('entity '):
+        head = line[7:].split(None, 1)
+        if head and head[0].isascii() and head[0].replace('_', '').isalnum():
+            return head[0]
+    # tabs, "entity Name{" etc.
+    m = _ENTITY_RE.match(line)
+    return m.group(1) if m else None
+
 def parse_puml(path):
     entities = {}
-    relations = []  # dicts: left, connector, right
+    relations = []  # dicts: left, connector, right, kind
     current = None
     with open(path, 'r', encoding='utf-8') as f:
         for raw in f:
@@ -66,9 +103,9 @@ def parse_puml(path):
             if not line or line.startswith("'"):
                 continue
             # entity start
-            m = re.match(r'^entity\s+([A-Za-z0-9_]+)', line)
-            if m:
-                current = m.group(1)
+            name = entity_name(line)
+            if name:
+                current = name
                 entities[current] = []
                 continue
             # end
@@ -83,10 +120,12 @@ def parse_puml(path):
                 continue
             # relation
             if '--' in line:
-                parts = re.split(r'\s+', line)
+                # left, connector, right (+ optional trailing label)
+                parts = line.split(None, 3)
                 if len(parts) >= 3:
                     left, connector, right = parts[0], parts[1], parts[2]
-                    relations.append({'left': left, 'connector': connector, 'right': right})
+                    relations.append({'left': left, 'connector': connector, 'right': right,
+                                      'kind': connector_kind(connector)})
     return entities, relations
 
 # ---------------- Core generation logic ----------------
@@ -107,336 +146,486 @@ def is_mn(conn):
 def is_1n(conn):
     return '||--o{' in conn or '|o--o{' in conn
 
-def generate_csvs(entities, relations, out_dir, rows=5):
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir)
+# relation kinds, decided once per connector string
+REL_MN, REL_CHILD_LEFT, REL_PARENT_LEFT, REL_OTHER = 'mn', 'child_left', 'parent_left', 'other'
+_CONN_KINDS = {
+    '}o--o{': REL_MN,
+    '|o--o{': REL_CHILD_LEFT,
+    '||--o{': REL_PARENT_LEFT,
+    '}o--o|': REL_OTHER,
+    '}o--||': REL_OTHER,
+}
+
+def connector_kind(conn):
+    kind = _CONN_KINDS.get(conn)
+    if kind is None:
+        # unknown connector: same substring rules as before, cached for next time
+        if is_mn(conn):
+            kind = REL_MN
+        elif '|o--o{' in conn:
+            kind = REL_CHILD_LEFT
+        elif '||--o{' in conn:
+            kind = REL_PARENT_LEFT
+        else:
+            kind = REL_OTHER
+        _CONN_KINDS[conn] = kind
+    return kind
+
+def generate_csvs(entities, relations, out_dir, rows=5, seed=None, batch_size=BATCH_SIZE, compress=False, workers=1):
+    # pass a seed for reproducible output: the same bytes for any batch_size
+    # and any number of workers. rows are generated and written batch_size
+    # at a time; compress=True writes <name>.csv.gz files instead; workers > 1
+    # writes the CSVs in that many processes
+    rng = random.Random(seed)
+
+    os.makedirs(out_dir, exist_ok=True)
 
     assoc = detect_assoc_entities(entities, relations)
 
     # Decide where FK columns go.
     # Special-case: if left is Document and connector is |o--o{ to Journal/Event, FK goes in Document (user requirement).
     # General rule: for '|o--o{' treat left as child -> FK in left; for '||--o{' treat left as parent -> FK in right.
+    # lower-cased column names per entity, for O(1) "already has this FK" checks
+    cols_set = {ent: set(c.lower() for c in cs) for ent, cs in entities.items()}
     for r in relations:
-        left, conn, right = r['left'], r['connector'], r['right']
-        if is_mn(conn):
+        left, right = r['left'], r['right']
+        kind = r.get('kind') or connector_kind(r['connector'])
+        if kind == REL_MN:
             continue
         # don't add FK linking association entities (they remain separate)
         if left in assoc or right in assoc:
             continue
-        if '|o--o{' in conn:
+        if kind == REL_CHILD_LEFT:
             # left is child (e.g., Document |o--o{ Journal -> document has journal_id)
             fk_col = right.lower() + "_id"
-            if fk_col not in entities[left]:
+            if fk_col not in cols_set[left]:
                 entities[left].append(fk_col)
-        elif '||--o{' in conn:
+                cols_set[left].add(fk_col)
+        elif kind == REL_PARENT_LEFT:
             # left is parent, right is child (left ||--o{ right) -> FK in right
             fk_col = left.lower() + "_id"
-            if fk_col not in entities[right]:
+            if fk_col not in cols_set[right]:
                 entities[right].append(fk_col)
+                cols_set[right].add(fk_col)
         else:
             # fallback: if left == Document and right in Journal/Event, put FK in Document
             if left == "Document" and right in ("Journal","Event"):
                 fk_col = right.lower() + "_id"
-                if fk_col not in entities[left]:
+                if fk_col not in cols_set[left]:
                     entities[left].append(fk_col)
+                    cols_set[left].add(fk_col)
             else:
                 # default: FK in right
                 fk_col = left.lower() + "_id"
-                if fk_col not in entities[right]:
+                if fk_col not in cols_set[right]:
                     entities[right].append(fk_col)
+                    cols_set[right].add(fk_col)
 
     # Pre-generate PKs lists for each entity (if entity has <entity>_id column use that)
     pk_values = {}
     for ent, cols in entities.items():
-        ent_id_col = None
-        lowered = [c.lower() for c in cols]
-        candidate = ent.lower() + "_id"
-        if candidate in lowered:
-            ent_id_col = cols[lowered.index(candidate)]
-        else:
+        # lower-cased name -> first column with that name (insertion ordered)
+        lowered_map = {}
+        for c in cols:
+            lowered_map.setdefault(c.lower(), c)
+        ent_id_col = lowered_map.get(ent.lower() + "_id")
+        if ent_id_col is None:
             # fallback to first _id
-            for i,c in enumerate(lowered):
-                if c.endswith("_id"):
-                    ent_id_col = cols[i]
-                    break
+            ent_id_col = next((c for cl, c in lowered_map.items() if cl.endswith("_id")), None)
         if ent_id_col:
-            pk_values[ent] = [i+1 for i in range(rows)]
+            pk_values[ent] = range(1, rows + 1)
         else:
             pk_values[ent] = []
 
-    # Pre-generate persons data so authorship.display_author_name can reference them
-    persons = {}
+    # Pre-generate persons once; the Person CSV and authorship.display_author_name
+    # both read from it by row index (rows are PERSON_FIELDS tuples)
+    persons = []
     if 'Person' in entities:
-        # find person columns to know order
-        person_cols = entities['Person']
-        # ensure person_id exists?
-        if not any(c.lower()== 'person_id' for c in person_cols):
-            # we'll use index+1 as person_id even if absent
-            pass
-        for i in range(len(pk_values.get('Person', [1]))):
-            pid = pk_values.get('Person', [1])[i]
-            firstname = random.choice(FIRSTNAMES)
-            lastname = random.choice(LASTNAMES)
-            # other_name as father's name
-            other_name = random.choice(FIRSTNAMES)
-            orcid = make_orcid()
-            persons[str(pid)] = {
-                'person_id': pid,
-                'firstname': firstname,
-                'lastname': lastname,
-                'other_name': other_name,
-                'orcid': orcid
-            }
-
-    # Helper to pick existing PK from an entity
-    def pick_pk(ent):
-        vals = pk_values.get(ent)
-        if vals:
-            return random.choice(vals)
-        # fallback: random small int
-        return random.randint(1, max(1, rows))
-
-    # Now write entity CSVs with semantic values
-    for ent, cols in entities.items():
-        fname = os.path.join(out_dir, ent.lower() + ".csv")
-        with open(fname, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(cols)
-            for idx in range(rows):
-                row = []
-                for c in cols:
-                    cl = c.lower()
-
-                    # deterministic entity PK if present
-                    if cl == ent.lower() + "_id" and pk_values.get(ent):
-                        row.append(pk_values[ent][idx % len(pk_values[ent])])
-                        continue
-
-                    # special per-column rules
-                    if ent == "Authorship" and cl == "display_author_name":
-                        # need a person FK on this row - prefer authorship has person_id column; find person_id in columns
-                        # If person_id exists, we'll fill it and then use it
-                        # Here we'll choose random person and concat firstname+lastname
-                        pid = pick_pk('Person')
-                        person = persons.get(str(pid)) or {'firstname': random.choice(FIRSTNAMES), 'lastname': random.choice(LASTNAMES)}
-                        row.append(person['firstname'] + " " + person['lastname'])
-                        continue
-
-                    if ent == "Citations" and cl in ("source","citation_source"):
-                        row.append(random.choice(CITATION_SOURCES))
-                        continue
-                    if ent == "Citations" and cl in ("number","citation_number"):
-                        row.append(random.randint(1,500))
-                        continue
-
-                    if ent == "Document" and cl == "page_start":
-                        # generate then ensure page_end larger
-                        pstart = random.randint(1,200)
-                        row.append(pstart)
-                        continue
-                    if ent == "Document" and cl == "page_end":
-                        # ensure > page_start
-                        # We need previous value page_start from this row (we may not have it if columns order different)
-                        # Safer approach: pick start then pick end > start
-                        # find index of page_start in cols
-                        try:
-                            ps_idx = [cc.lower() for cc in cols].index('page_start')
-                            # if that column is earlier, use the value we already wrote in row
-                            if ps_idx < len(row):
-                                start_val = int(row[ps_idx])
-                                end_val = start_val + random.randint(1, 30)
-                                row.append(end_val)
-                                continue
-                        except ValueError:
-                            pass
-                        # fallback
-                        row.append(random.randint(2, 400))
-                        continue
-
-                    if ent == "Advisorship":
-                        # prefer columns: advisor_person_id, student_person_id, advising_relationship_type
-                        if 'advisor_person_id' in [x.lower() for x in cols] and cl == 'advisor_person_id':
-                            # choose advisor
-                            pr = pick_pk('Person')
-                            row.append(pr)
-                            continue
-                        if 'student_person_id' in [x.lower() for x in cols] and cl == 'student_person_id':
-                            # choose student distinct from advisor (if advisor chosen already)
-                            # get last appended advisor if present
-                            advisor_val = None
-                            # find advisor column index
-                            try:
-                                aidx = [cc.lower() for cc in cols].index('advisor_person_id')
-                                if aidx < len(row):
-                                    advisor_val = row[aidx]
-                            except ValueError:
-                                advisor_val = None
-                            s = pick_pk('Person')
-                            attempts = 0
-                            while advisor_val is not None and str(s) == str(advisor_val) and attempts < 10:
-                                s = pick_pk('Person'); attempts += 1
-                            row.append(s)
-                            continue
-                        if cl == 'advising_relationship_type':
-                            row.append(random.choice(ADVISORY_TYPES))
-                            continue
-
-                    if ent == "Event" and cl == "name":
-                        row.append(random.choice(EVENT_NAMES))
-                        continue
-
-                    if ent == "Geolocation":
-                        if cl == "name":
-                            row.append(random.choice(GEO_NAMES))
-                            continue
-                        if cl == "code":
-                            # pick matching code for name if possible; otherwise random ISO-like
-                            # simple: choose pair
-                            name = random.choice(GEO_NAMES)
-                            row.append(GEO_CODES.get(name, "XX"))
-                            continue
-
-                    if ent == "Grant" and cl == "name":
-                        row.append(random.choice(GRANT_NAMES))
-                        continue
-                    if ent == "Grant" and cl == "total_award_amount":
-                        # produce number in USD, e.g., 2400000 -> 2.4 million; user asked e.g. 2.4 millions
-                        millions = round(random.uniform(0.5, 5.0), 2)
-                        # store as number of USD
-                        row.append(millions * 1_000_000)
-                        continue
-
-                    if ent.lower() == "investigatorship" or (ent == "Contributorship" and cl in ("roletype","roletype".lower(), "roleType".lower())):
-                        # some PUML use roleType; we try to fill role_type etc.
-                        if "role" in cl:
-                            row.append(random.choice(INVESTIGATOR_ROLES))
-                            continue
-
-                    if ent == "Journal":
-                        if cl == "title":
-                            # pick from JOURNAL_TITLES
-                            t = random.choice(JOURNAL_TITLES)
-                            row.append(t)
-                            continue
-                        if cl == "abbreviation":
-                            # derive from title
-                            t = random.choice(JOURNAL_TITLES)
-                            row.append(make_abbrev(t))
-                            continue
-                        if cl == "issn":
-                            row.append(make_issn())
-                            continue
-
-                    if ent == "OrganisationUnit":
-                        if cl == "abbreviation":
-                            row.append(make_abbrev(random.choice(ORG_NAMES)))
-                            continue
-                        if cl == "ror":
-                            row.append(make_ror())
-                            continue
-                        if cl == "type":
-                            row.append(random.choice(ORG_TYPES))
-                            continue
-
-                    if ent == "Person":
-                        if cl == "other_name":
-                            # father's name
-                            row.append(random.choice(FIRSTNAMES))
-                            continue
-                        if cl == "preferred_title":
-                            row.append(random.choice(PREFERRED_TITLES))
-                            continue
-                        if cl == "orcid":
-                            row.append(make_orcid())
-                            continue
-                        if cl == "type":
-                            row.append(random.choice(PERSON_TYPES))
-                            continue
-
-                    if ent == "Position" and cl == "type":
-                        row.append(random.choice(POSITION_TYPES))
-                        continue
-						
-                    if ent == "Position" and cl == "title":
-                        row.append(random.choice(POSITION_TITLES))
-                        continue
-
-                    # default behaviors for numeric-like columns
-                    if cl in ("publication_year","start_year","end_year"):
-                        row.append(random.randint(1990,2025))
-                        continue
-
-                    # general FK columns (xxx_id)
-                    if cl.endswith("_id"):
-                        ref = cl[:-3]
-                        # pick from pk_values if exists
-                        val = pick_pk_for_ref(pk_values, ref, rows)
-                        row.append(val)
-                        continue
-
-                    # default synthesized value
-                    row.append(synth_generic_value(cl))
-
-                writer.writerow(row)
-
-    # Create M:N join tables (document_researcharea, person_researcharea, etc.)
-    for r in relations:
-        if is_mn(r['connector']):
-            left, right = r['left'], r['right']
-            key = f"{left.lower()}_{right.lower()}"
-            fname = os.path.join(out_dir, key + ".csv")
-            left_vals = pk_values.get(left) or [1]
-            right_vals = pk_values.get(right) or [1]
-            with open(fname, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([f"{left.lower()}_id", f"{right.lower()}_id"])
-                # include coverage: each PK at least once
-                pairs = []
-                minlen = min(len(left_vals), len(right_vals))
-                for i in range(minlen):
-                    pairs.append((left_vals[i % len(left_vals)], right_vals[i % len(right_vals)]))
-                while len(pairs) < rows:
-                    pairs.append((random.choice(left_vals), random.choice(right_vals)))
-                for a,b in pairs[:rows]:
-                    writer.writerow([a,b])
+        pids = pk_values.get('Person', [])
+        n = len(pids)
+        persons = list(zip(
+            pids,
+            rng.choices(FIRSTNAMES, k=n),
+            rng.choices(LASTNAMES, k=n),
+            rng.choices(FIRSTNAMES, k=n),  # other_name as father's name
+            make_orcids(n, rng),
+        ))
+
+    # Everything above is shared, read-only state; each entity CSV and M:N
+    # join table below is independent of the others
+    ctx = {
+        'out_dir': out_dir, 'rows': rows, 'seed': seed, 'batch_size': batch_size,
+        'compress': compress, 'pk_values': pk_values, 'persons': persons,
+    }
+    tasks = [('entity', ent, cols) for ent, cols in entities.items()]
+    # M:N join tables (document_researcharea, person_researcharea, etc.)
+    tasks += [('join', r['left'], r['right']) for r in relations
+              if (r.get('kind') or connector_kind(r['connector'])) == REL_MN]
+    # one task per output file (repeated M:N lines, names differing only in
+    # case); the last one wins, as it did when later files overwrote earlier
+    # ones, and parallel workers never write the same file
+    tasks = list({output_name(task): task for task in tasks}.values())
+
+    if workers > 1 and len(tasks) > 1:
+        # fork shares ctx with the workers without pickling it
+        mp_ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(workers, mp_context=mp_ctx, initializer=init_worker, initargs=(ctx,)) as ex:
+            list(ex.map(run_task, tasks))
+    else:
+        for task in tasks:
+            run_task(task, ctx)
 
     print("Done. CSVs in:", out_dir)
 
 # Helper functions used in generation (defined below to keep main clean)
-def pick_pk_for_ref(pk_values, ref, rows):
+
+def task_rng(seed, name):
+    # each output file gets its own RNG, seeded from (seed, file) when seeded
+    return random.Random(None if seed is None else f"{seed}:{name}")
+
+def sub_rng(rng):
+    # independent RNG for one lazily drawn column, so how its batches
+    # interleave with other draws can't change the output
+    return random.Random(rng.getrandbits(64))
+
+def output_name(task):
+    # CSV file name a ('entity', ent, cols) or ('join', left, right) task writes
+    kind, a, b = task
+    if kind == 'entity':
+        return a.lower() + ".csv"
+    return f"{a.lower()}_{b.lower()}.csv"
+
+def write_entity_csv(ent, cols, ctx):
+    rows, batch_size = ctx['rows'], ctx['batch_size']
+    fname = os.path.join(ctx['out_dir'], output_name(('entity', ent, cols)))
+    rng = task_rng(ctx['seed'], ent)
+    # the per-column rules are resolved once per entity, not once per cell
+    gens = build_generators(ent, cols, ctx['pk_values'], ctx['persons'], rows, rng, batch_size)
+    plain = CSV_SAFE_POOLS and not any(needs_quoting(c) for c in cols)
+    write_csv(fname, cols, ([g() for g in gens] for _ in range(rows)), plain, batch_size, ctx['compress'])
+
+def write_join_csv(left, right, ctx):
+    rows, batch_size, pk_values = ctx['rows'], ctx['batch_size'], ctx['pk_values']
+    key = f"{left.lower()}_{right.lower()}"
+    fname = os.path.join(ctx['out_dir'], output_name(('join', left, right)))
+    rng = task_rng(ctx['seed'], key)
+    left_vals = pk_values.get(left) or [1]
+    right_vals = pk_values.get(right) or [1]
+    # include coverage: each PK at least once
+    minlen = min(len(left_vals), len(right_vals), rows)
+    # the rest is random, drawn a batch at a time
+    n_extra = rows - minlen
+    pairs = chain(
+        zip(left_vals[:minlen], right_vals[:minlen]),
+        zip(draw_in_batches(partial(sub_rng(rng).choices, left_vals), n_extra, batch_size),
+            draw_in_batches(partial(sub_rng(rng).choices, right_vals), n_extra, batch_size)),
+    )
+    # pairs of integer PKs never need quoting, so format the bytes directly
+    with open_output(fname, ctx['compress']) as f:
+        f.write(f"{left.lower()}_id,{right.lower()}_id\r\n".encode('utf-8'))
+        for batch in batched(pairs, batch_size):
+            f.write(b"".join(b"%d,%d\r\n" % pair for pair in batch))
+
+# generation context of a worker process, set once by init_worker
+_worker_ctx = None
+
+def init_worker(ctx):
+    global _worker_ctx
+    _worker_ctx = ctx
+
+def run_task(task, ctx=None):
+    kind, a, b = task
+    write = write_entity_csv if kind == 'entity' else write_join_csv
+    write(a, b, ctx if ctx is not None else _worker_ctx)
+
+def batched(iterable, n):
+    # lists of up to n items from iterable
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, n))
+        if not batch:
+            return
+        yield batch
+
+def draw_in_batches(draw, n, batch_size):
+    # n values from draw(k=...), requested at most batch_size at a time
+    for start in range(0, n, batch_size):
+        yield from draw(k=min(batch_size, n - start))
+
+@contextmanager
+def open_output(fname, compress=False):
+    # binary output file, or <fname>.gz when compressing
+    if not compress:
+        with open(fname, 'wb', buffering=WRITE_BUFFER) as f:
+            yield f
+        return
+    # mtime=0 keeps the timestamp out of the gzip header, so seeded runs
+    # give the same .gz bytes
+    with open(fname + '.gz', 'wb', buffering=WRITE_BUFFER) as raw, \
+            gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+        yield f
+
+def needs_quoting(value):
+    # what csv.writer's default QUOTE_MINIMAL would quote
+    return any(ch in value for ch in ',"\r\n')
+
+# True when no value from the fixed pools needs quoting; generated numbers,
+# ids and "<column>_<n>" values only add digits and column names to that
+CSV_SAFE_POOLS = not any(needs_quoting(v) for pool in (
+    DOC_TITLES, FIRSTNAMES, LASTNAMES, JOURNAL_TITLES, EVENT_NAMES, GEO_NAMES,
+    GEO_CODES.values(), GRANT_NAMES, INVESTIGATOR_ROLES, ADVISORY_TYPES,
+    CITATION_SOURCES, POSITION_TYPES, POSITION_TITLES, ORG_TYPES, ORG_NAMES,
+    _JOURNAL_ABBREVS, _ORG_ABBREVS,
+) for v in pool)
+
+def write_csv(fname, header, rows, plain=False, batch_size=BATCH_SIZE, compress=False):
+    # rows are rendered, encoded and written batch_size at a time, so memory
+    # stays bounded however many rows there are
+    with open_output(fname, compress) as f:
+        if plain:
+            # nothing needs quoting, so a plain join gives the same bytes as csv.writer
+            f.write((",".join(header) + "\r\n").encode('utf-8'))
+            for batch in batched(rows, batch_size):
+                f.write("".join(",".join(map(str, row)) + "\r\n" for row in batch).encode('utf-8'))
+        else:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(header)
+            for batch in batched(rows, batch_size):
+                writer.writerows(batch)
+                f.write(buf.getvalue().encode('utf-8'))
+                buf.seek(0)
+                buf.truncate()
+            f.write(buf.getvalue().encode('utf-8'))
+
+# layout of the pre-generated person tuples
+PERSON_FIELDS = ('person_id', 'firstname', 'lastname', 'other_name', 'orcid')
+
+# int-coded column kinds; everything but KIND_OTHER is generated column-wise
+KIND_OTHER, KIND_PK, KIND_FK, KIND_YEAR, KIND_CITATION_NUMBER, KIND_PAGE_START = range(6)
+INT_RANGES = {
+    KIND_YEAR: (1990, 2025),
+    KIND_CITATION_NUMBER: (1, 500),
+    KIND_PAGE_START: (1, 200),
+}
+
+def column_kind(ent, cl, has_pk):
+    # same precedence as the per-column rules in generate_csvs
+    if cl == ent.lower() + "_id" and has_pk:
+        return KIND_PK
+    if ent == "Citations" and cl in ("number","citation_number"):
+        return KIND_CITATION_NUMBER
+    if ent == "Document" and cl == "page_start":
+        return KIND_PAGE_START
+    if ent == "Advisorship" and cl in ('advisor_person_id', 'student_person_id'):
+        return KIND_OTHER
+    if ent.lower() == "investigatorship" and "role" in cl:
+        return KIND_OTHER
+    if cl in ("publication_year","start_year","end_year"):
+        return KIND_YEAR
+    if cl.endswith("_id"):
+        return KIND_FK
+    return KIND_OTHER
+
+def fill_numeric_columns(ent, cols_lower, kinds, pk_values, rows, rng, batch_size):
+    # {column index: iterable of values} for every column that isn't KIND_OTHER;
+    # random columns are drawn batch_size values at a time as they are consumed,
+    # each from its own sub_rng
+    filled = {}
+    for j, kind in enumerate(kinds):
+        if kind == KIND_PK:
+            filled[j] = pk_values[ent]
+        elif kind == KIND_FK:
+            draw = partial(pick_pks_for_ref, pk_values, cols_lower[j][:-3], rows, rng=sub_rng(rng))
+            filled[j] = draw_in_batches(draw, rows, batch_size)
+        elif kind in INT_RANGES:
+            lo, hi = INT_RANGES[kind]
+            filled[j] = draw_in_batches(partial(sub_rng(rng).choices, range(lo, hi + 1)), rows, batch_size)
+    return filled
+
+def build_generators(ent, cols, pk_values, persons, rows, rng, batch_size=BATCH_SIZE):
+    # one zero-arg callable per column; a row is then just [g() for g in gens]
+    cols_lower = [c.lower() for c in cols]
+    col_idx = {}
+    for i, cl in enumerate(cols_lower):
+        col_idx.setdefault(cl, i)
+    kinds = [column_kind(ent, cl, bool(pk_values.get(ent))) for cl in cols_lower]
+
+    # bound methods looked up once, not per cell
+    choice, randint, uniform = rng.choice, rng.randint, rng.uniform
+
+    # page_start/page_end are drawn as a pair by whichever column comes first,
+    # so page_end > page_start regardless of column order
+    paired_pages = ent == "Document" and 'page_start' in col_idx and 'page_end' in col_idx
+    if paired_pages:
+        kinds[col_idx['page_start']] = KIND_OTHER
+        pending = deque()
+        def pages(want_start):
+            if pending:
+                return pending.popleft()
+            start = randint(1, 200)
+            end = start + randint(1, 30)
+            pending.append(end if want_start else start)
+            return start if want_start else end
+
+    numeric = fill_numeric_columns(ent, cols_lower, kinds, pk_values, rows, rng, batch_size)
+
+    # values of the current row that later columns depend on
+    advisor = [None]
+
+    def remember(gen, slot):
+        def g():
+            slot[0] = gen()
+            return slot[0]
+        return g
+
+    gens = []
+    for j, cl in enumerate(cols_lower):
+        # PK, FK and int-range columns, pre-drawn column-wise
+        if j in numeric:
+            gen = iter(numeric[j]).__next__
+
+        elif paired_pages and j == col_idx['page_start']:
+            gen = partial(pages, True)
+        elif paired_pages and j == col_idx['page_end']:
+            gen = partial(pages, False)
+
+        # special per-column rules
+        elif ent == "Person" and cl in PERSON_FIELDS and len(persons) >= rows:
+            # row i of the Person CSV is persons[i]
+            gen = map(itemgetter(PERSON_FIELDS.index(cl)), persons).__next__
+
+        elif ent == "Authorship" and cl == "display_author_name":
+            # full name of a random person, joined once per person rather than per row
+            if persons:
+                gen = partial(choice, [p[1] + " " + p[2] for p in persons])
+            else:
+                gen = partial(choice, _FULLNAMES)
+
+        elif ent == "Citations" and cl in ("source","citation_source"):
+            gen = partial(choice, CITATION_SOURCES)
+
+        elif ent == "Document" and cl == "page_end":
+            # no page_start to stay above
+            gen = partial(randint, 2, 400)
+
+        elif ent == "Advisorship" and cl == 'advisor_person_id':
+            gen = remember(partial(pick_pk, pk_values, 'Person', rows, rng), advisor)
+        elif ent == "Advisorship" and cl == 'student_person_id':
+            # choose student distinct from advisor (if advisor chosen already)
+            check_advisor = 0 <= col_idx.get('advisor_person_id', -1) < j
+            pick_person = partial(pick_pk, pk_values, 'Person', rows, rng)
+            def gen():
+                s = pick_person()
+                attempts = 0
+                while check_advisor and s == advisor[0] and attempts < 10:
+                    s = pick_person(); attempts += 1
+                return s
+        elif ent == "Advisorship" and cl == 'advising_relationship_type':
+            gen = partial(choice, ADVISORY_TYPES)
+
+        elif ent == "Event" and cl == "name":
+            gen = partial(choice, EVENT_NAMES)
+
+        elif ent == "Geolocation" and cl == "name":
+            gen = partial(choice, GEO_NAMES)
+        elif ent == "Geolocation" and cl == "code":
+            # simple: choose a name and use its code
+            gen = lambda: GEO_CODES.get(choice(GEO_NAMES), "XX")
+
+        elif ent == "Grant" and cl == "name":
+            gen = partial(choice, GRANT_NAMES)
+        elif ent == "Grant" and cl == "total_award_amount":
+            # amount in USD, e.g. 2.4 millions
+            gen = lambda: round(uniform(0.5, 5.0), 2) * 1_000_000
+
+        elif (ent.lower() == "investigatorship" or (ent == "Contributorship" and cl == "roletype")) and "role" in cl:
+            # some PUML use roleType; we try to fill role_type etc.
+            gen = partial(choice, INVESTIGATOR_ROLES)
+
+        elif ent == "Journal" and cl == "title":
+            gen = partial(choice, JOURNAL_TITLES)
+        elif ent == "Journal" and cl == "abbreviation":
+            # derived from a title
+            gen = partial(choice, _JOURNAL_ABBREVS)
+        elif ent == "Journal" and cl == "issn":
+            gen = partial(make_issn, rng)
+
+        elif ent == "OrganisationUnit" and cl == "abbreviation":
+            gen = partial(choice, _ORG_ABBREVS)
+        elif ent == "OrganisationUnit" and cl == "ror":
+            gen = partial(make_ror, rng)
+        elif ent == "OrganisationUnit" and cl == "type":
+            gen = partial(choice, ORG_TYPES)
+
+        elif ent == "Person" and cl == "other_name":
+            # father's name
+            gen = partial(choice, FIRSTNAMES)
+        elif ent == "Person" and cl == "preferred_title":
+            gen = partial(choice, PREFERRED_TITLES)
+        elif ent == "Person" and cl == "orcid":
+            gen = partial(make_orcid, rng)
+        elif ent == "Person" and cl == "type":
+            gen = partial(choice, PERSON_TYPES)
+
+        elif ent == "Position" and cl == "type":
+            gen = partial(choice, POSITION_TYPES)
+        elif ent == "Position" and cl == "title":
+            gen = partial(choice, POSITION_TITLES)
+
+        # default synthesized value
+        else:
+            gen = partial(synth_generic_value, cl, rng)
+
+        gens.append(gen)
+    return gens
+
+def pick_pk(pk_values, ent, rows, rng=random):
+    # pick an existing PK from an entity
+    vals = pk_values.get(ent)
+    if vals:
+        return rng.choice(vals)
+    # fallback: random small int
+    return rng.randint(1, max(1, rows))
+
+def pick_pks_for_ref(pk_values, ref, rows, k, rng=random):
+    # k random PKs for one FK column in a single call
     # try matches like 'Journal' for ref 'journal'
-    for k in pk_values:
-        if k.lower() == ref.lower():
-            vals = pk_values[k]
+    for ent in pk_values:
+        if ent.lower() == ref.lower():
+            vals = pk_values[ent]
             if vals:
-                return random.choice(vals)
+                return rng.choices(vals, k=k)
     # fallback random
-    return random.randint(1, max(1, rows))
+    return rng.choices(range(1, max(1, rows) + 1), k=k)
 
-def synth_generic_value(col_lower):
+def synth_generic_value(col_lower, rng=random):
     # fallback generic generator
     if 'name' in col_lower:
-        return random.choice(ORG_NAMES + FIRSTNAMES)
+        return rng.choice(ORG_NAMES + FIRSTNAMES)
     if 'title' in col_lower:
-        return random.choice(DOC_TITLES)
+        return rng.choice(DOC_TITLES)
     if 'doi' in col_lower:
-        return f"10.{random.randint(100,999)}/{random.randint(1000,9999)}"
+        return f"10.{rng.randint(100,999)}/{rng.randint(1000,9999)}"
     if 'issn' in col_lower:
-        return make_issn()
+        return make_issn(rng)
     if 'isbn' in col_lower:
-        return str(random.randint(1000000000,9999999999))
+        return str(rng.randint(1000000000,9999999999))
     if 'page' in col_lower or 'volume' in col_lower or 'issue' in col_lower:
-        return random.randint(1,200)
-    return f"{col_lower}_{random.randint(1,100)}"
+        return rng.randint(1,200)
+    return f"{col_lower}_{rng.randint(1,100)}"
 
 # ---------------- Main CLI ----------------
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python3 puml2csv_semantic_final.py model.puml out_dir [rows]")
+        print("Usage: python3 puml2csv_semantic_final.py model.puml out_dir [rows] [seed] [workers]")
+        print("       seed may be '' or - for an unseeded run")
         sys.exit(1)
     puml = sys.argv[1]
     out_dir = sys.argv[2] if len(sys.argv) > 2 else "csv_final"
     rows = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4] not in ('', '-') else None
+    workers = int(sys.argv[5]) if len(sys.argv) > 5 else 1
 
     ents, rels = parse_puml(puml)
-    generate_csvs(ents, rels, out_dir, rows)
+    generate_csvs(ents, rels, out_dir, rows, seed, workers=workers)